@@ -12,8 +12,56 @@ import os
 import subprocess
 from datetime import datetime, timezone
 
+# Only the agent pipeline reads the checkpoint back — pretty-printing
+# costs a formatter pass and roughly doubles the bytes written, read and
+# pushed every turn. Set AGENT_DEBUG_STATE to get indented JSON when
+# inspecting state by hand.
+_DEBUG_STATE = bool(os.environ.get("AGENT_DEBUG_STATE"))
+
+# orjson serializes/parses several times faster than stdlib json and
+# emits bytes directly; fall back to stdlib when unavailable
+# (mirrors the optional import in main.py)
+try:
+    import orjson
+
+    _ORJSON_OPTS = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_INDENT_2 if _DEBUG_STATE else 0)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=_ORJSON_OPTS)
+
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        if _DEBUG_STATE:
+            return json.dumps(obj, indent=2).encode() + b"\n"
+        return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+    def _dumps_line(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+    _loads = json.loads
+
 CHECKPOINT_FILE = ".agent-checkpoint.json"
 
+# Append-only sidecar for per-turn action log entries. The checkpoint
+# JSON is rewritten in full every turn; keeping the log out of it makes
+# each rewrite O(header) instead of O(turns so far).
+ACTION_LOG_FILE = ".agent-action-log.jsonl"
+
+# Commit identity passed as -c flags so checkpoint commits work without
+# a prior `git config` step (mirrors GIT_IDENTITY_ARGS in main.py)
+GIT_IDENTITY_ARGS = (
+    "-c", "user.name=Crowd Agent[bot]",
+    "-c", "user.email=crowd-agent-bot@users.noreply.github.com",
+)
+
+# Let git's curl backend multiplex the push negotiation over HTTP/2
+# (mirrors GIT_HTTP_ARGS in main.py)
+GIT_HTTP_ARGS = ("-c", "http.version=HTTP/2")
+
 REPO_DIR = os.environ.get(
     "GITHUB_WORKSPACE",
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
@@ -33,19 +81,54 @@ def _run_git(*args):
     return result.stdout.strip()
 
 
+def _checkpoint_unchanged(checkpoint: dict, checkpoint_path: str) -> bool:
+    """True if the checkpoint on disk already matches, ignoring updated_at.
+
+    Lets save_checkpoint skip the write and the commit+push round-trip
+    when a run produced no real state change (e.g. retries after an
+    early error) — only the timestamp would have differed.
+    """
+    if not os.path.isfile(checkpoint_path):
+        return False
+    try:
+        with open(checkpoint_path, "rb") as f:
+            existing = _loads(f.read())
+    except (ValueError, OSError):
+        return False
+    strip = lambda d: {k: v for k, v in d.items() if k != "updated_at"}
+    return strip(existing) == strip(checkpoint)
+
+
 def save_checkpoint(checkpoint: dict, changed_files: list[str]):
     """Write checkpoint to disk, git add changed files + checkpoint, commit, push."""
-    checkpoint["updated_at"] = datetime.now(timezone.utc).isoformat()
     checkpoint_path = os.path.join(REPO_DIR, CHECKPOINT_FILE)
 
-    with open(checkpoint_path, "w") as f:
-        json.dump(checkpoint, f, indent=2)
-        f.write("\n")
+    if not changed_files and _checkpoint_unchanged(checkpoint, checkpoint_path):
+        print("Checkpoint unchanged — skipping commit and push.")
+        return
+
+    checkpoint["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-    # Stage checkpoint file + any files changed this turn
-    _run_git("add", CHECKPOINT_FILE)
-    for fpath in changed_files:
-        _run_git("add", fpath)
+    # Write to a temp file and rename into place — os.replace is atomic,
+    # so a crash mid-write can't leave a truncated checkpoint behind
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "wb", buffering=65536) as f:
+        f.write(_dumps(checkpoint))
+    os.replace(tmp_path, checkpoint_path)
+
+    # Stage checkpoint file + action log + any files changed this turn in
+    # one invocation instead of paying fork+exec overhead per path
+    log_files = [ACTION_LOG_FILE] if os.path.isfile(os.path.join(REPO_DIR, ACTION_LOG_FILE)) else []
+    try:
+        _run_git("add", "--", CHECKPOINT_FILE, *log_files, *changed_files)
+    except RuntimeError:
+        # One bad path shouldn't abort the batch — retry per file
+        _run_git("add", "--", CHECKPOINT_FILE, *log_files)
+        for fpath in changed_files:
+            try:
+                _run_git("add", "--", fpath)
+            except RuntimeError:
+                pass
 
     turn = checkpoint.get("turn", 0)
     # Build a descriptive commit message
@@ -55,8 +138,8 @@ def save_checkpoint(checkpoint: dict, changed_files: list[str]):
     else:
         commit_msg = f"\U0001f9e0 turn {turn}: checkpoint"
 
-    _run_git("commit", "-m", commit_msg)
-    _run_git("push")
+    _run_git(*GIT_IDENTITY_ARGS, "commit", "-m", commit_msg)
+    _run_git(*GIT_HTTP_ARGS, "push")
 
 
 def load_checkpoint() -> dict | None:
@@ -64,8 +147,8 @@ def load_checkpoint() -> dict | None:
     checkpoint_path = os.path.join(REPO_DIR, CHECKPOINT_FILE)
     if not os.path.isfile(checkpoint_path):
         return None
-    with open(checkpoint_path) as f:
-        return json.load(f)
+    with open(checkpoint_path, "rb") as f:
+        return _loads(f.read())
 
 
 def build_continuation_prompt(checkpoint: dict, system_prompt: str) -> list[dict]:
@@ -80,9 +163,10 @@ def build_continuation_prompt(checkpoint: dict, system_prompt: str) -> list[dict
 
     tool_prompt = _build_tool_prompt()
 
-    # Build progress summary from action log
+    # Build progress summary from action log (older checkpoints carried
+    # the log inline; newer ones keep it in the JSONL sidecar)
     progress_lines = []
-    for entry in checkpoint.get("action_log", []):
+    for entry in checkpoint.get("action_log") or read_action_log():
         progress_lines.append(
             f"- Turn {entry['turn']}: {entry['action']} — {entry['result_summary']}"
         )
@@ -124,11 +208,15 @@ def build_continuation_prompt(checkpoint: dict, system_prompt: str) -> list[dict
 def append_action_log(
     checkpoint: dict, tool_name: str, tool_args: dict, result: str
 ) -> None:
-    """Add a log entry to the checkpoint's action_log.
+    """Append a log entry to the action log sidecar.
 
     The result_summary is truncated but preserves enough for the next
     brain to make decisions. read_file gets a higher limit (2000 chars)
     since the model needs file contents to plan edits.
+
+    Entries go to the append-only JSONL sidecar, not the checkpoint
+    dict, so each turn writes one line instead of rewriting the whole
+    history with the checkpoint.
     """
     args_summary = ", ".join(
         f"{k}={repr(v)[:60]}" for k, v in tool_args.items()
@@ -139,16 +227,39 @@ def append_action_log(
     limit = 2000 if tool_name == "read_file" else 500
     result_summary = result[:limit] if len(result) > limit else result
 
-    if "action_log" not in checkpoint:
-        checkpoint["action_log"] = []
-
-    checkpoint["action_log"].append(
-        {
-            "turn": checkpoint.get("turn", 0),
-            "action": action_str,
-            "result_summary": result_summary,
-        }
-    )
+    entry = {
+        "turn": checkpoint.get("turn", 0),
+        "action": action_str,
+        "result_summary": result_summary,
+    }
+    log_path = os.path.join(REPO_DIR, ACTION_LOG_FILE)
+    with open(log_path, "ab") as f:
+        f.write(_dumps_line(entry))
+
+
+def read_action_log() -> list[dict]:
+    """Read all entries from the action log sidecar (empty if absent)."""
+    log_path = os.path.join(REPO_DIR, ACTION_LOG_FILE)
+    if not os.path.isfile(log_path):
+        return []
+    entries = []
+    with open(log_path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(_loads(line))
+            except ValueError:
+                continue  # Skip a corrupt line rather than lose the run
+    return entries
+
+
+def reset_action_log() -> None:
+    """Delete the action log sidecar (call when starting a fresh chain)."""
+    log_path = os.path.join(REPO_DIR, ACTION_LOG_FILE)
+    if os.path.isfile(log_path):
+        os.remove(log_path)
 
 
 def trigger_next_workflow(checkpoint: dict):
@@ -203,12 +314,19 @@ def should_finalize(checkpoint: dict) -> bool:
     return False
 
 
-def remove_checkpoint():
-    """Remove the checkpoint file from disk and stage the removal."""
+def remove_checkpoint() -> bool:
+    """Remove the checkpoint file from disk and stage the removal.
+
+    Returns True if a checkpoint file was actually removed, so callers
+    can skip the commit/push round-trip when there was nothing to do.
+    """
     checkpoint_path = os.path.join(REPO_DIR, CHECKPOINT_FILE)
-    if os.path.isfile(checkpoint_path):
-        os.remove(checkpoint_path)
-        try:
-            _run_git("rm", "--cached", CHECKPOINT_FILE)
-        except RuntimeError:
-            pass  # Already untracked
+    reset_action_log()
+    try:
+        _run_git("rm", "--cached", "--ignore-unmatch", CHECKPOINT_FILE, ACTION_LOG_FILE)
+    except RuntimeError:
+        pass  # Already untracked
+    if not os.path.isfile(checkpoint_path):
+        return False
+    os.remove(checkpoint_path)
+    return True
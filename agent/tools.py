@@ -5,36 +5,141 @@ Minimal tool implementations for the agent. These are the tools the agent
 can call during its build loop. The community can vote to add more tools.
 """
 
+import functools
+import json
+import mmap
 import os
 import re
+import sys
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+# Files above this size are read through mmap (no stdio buffer copy and a
+# single bulk decode); below it, plain read() wins — page-fault setup
+# overhead dominates for small files
+MMAP_THRESHOLD = 65536
 
 # Base directory of the repository (set at runtime)
 REPO_DIR = os.environ.get("GITHUB_WORKSPACE", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Track file changes made by the agent during a build
-file_changes: dict[str, str] = {}
+# Absolute repo root, resolved once — os.path.abspath calls getcwd()
+# every time, and REPO_DIR can't change after import
+_REPO_DIR_ABS = os.path.abspath(REPO_DIR)
+
+# Track file changes made by the agent during a build. Append-only log
+# of (path, content); the dict view is materialized on demand in
+# get_file_changes, with later writes to a path superseding earlier ones
+_change_log: list[tuple[str, str]] = []
+
+# Directories already ensured by write_file this build — makedirs walks
+# and stats every path component even when the tree exists
+_ensured_dirs: set[str] = set()
+
+# Directories and extensions search_files never looks inside
+SKIP_DIRS = frozenset({'.git', '__pycache__', '.venv', 'node_modules', '.pytest_cache', '.github'})
+SKIP_EXTS = frozenset({'.pyc', '.o', '.so', '.bin', '.jpg', '.png', '.gif', '.pdf', '.class'})
+
+# Known-text extensions skip the binary sniff in search_files entirely
+TEXT_EXTS = frozenset({
+    '.py', '.md', '.json', '.yaml', '.yml', '.txt', '.toml', '.cfg', '.ini',
+    '.js', '.ts', '.rs', '.go', '.c', '.h', '.cpp', '.html', '.css', '.sh',
+})
+
+
+@functools.lru_cache(maxsize=512)
+def _full(path: str) -> str:
+    """REPO_DIR-joined path, memoized — agents revisit the same files."""
+    return os.path.join(REPO_DIR, path)
+
+
+@functools.lru_cache(maxsize=512)
+def _parent_dir(full_path: str) -> str:
+    """Memoized dirname for write_file's makedirs call."""
+    return os.path.dirname(full_path)
+
+
+@functools.lru_cache(maxsize=128)
+def _compile(pattern: str, case_sensitive: bool) -> re.Pattern:
+    """Compile a search pattern, memoized — agents repeat patterns often.
+
+    MULTILINE keeps ^/$ anchored to line boundaries: the whole file is
+    scanned as one bytes buffer, so without it anchors would only match
+    at the buffer edges and searches like "^def " would come back empty.
+    """
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(pattern.encode("utf-8"), flags)
+
+
+# Regex metacharacters; a pattern without any of these is a plain substring
+_REGEX_METACHARS = frozenset(".^$*+?{}[]|()\\")
+
+# Constructs that can make a literal fragment optional — alternation,
+# optional/bounded repeats, character classes and escapes. A fragment
+# pulled from such a pattern is not guaranteed to appear in every match
+# (e.g. the "colou" of "colou?r", or one branch of "foo|bar"), so
+# seeding would silently drop valid matches. No prefiltering for these.
+_UNSAFE_SEED_CHARS = frozenset("|?*{[\\")
+
+# Splitter that breaks a pattern into its literal fragments
+_LITERAL_SPLIT_RE = re.compile(r"[.^$*+?{}\[\]|()\\]")
+
+
+def _literal_seed(pattern: str) -> str:
+    """Longest literal fragment of a regex, for bytes.find prefiltering.
+
+    bytes.find is a memmem-backed C loop, far cheaper than a regex scan,
+    so files that can't contain the seed are rejected without ever
+    running the regex. Only sound when the pattern contains none of
+    _UNSAFE_SEED_CHARS — callers must check that first, otherwise the
+    chosen fragment may be optional and the rejection wrong.
+    """
+    return max(_LITERAL_SPLIT_RE.split(pattern), key=len)
 
 
 def read_file(path: str) -> str:
     """Read a file from the repository."""
-    full_path = os.path.join(REPO_DIR, path)
-    if not os.path.isfile(full_path):
-        return f"Error: File not found: {path}"
+    full_path = _full(path)
+    # EAFP: let open raise for missing paths instead of paying a separate
+    # isfile stat on every (almost always successful) read. One open +
+    # fstat, then a single bulk decode — binary mode skips the text
+    # layer's incremental decoder, and stray invalid bytes become U+FFFD
+    # instead of failing the read
     try:
-        with open(full_path, "r") as f:
-            return f.read()
+        with open(full_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return mm[:].decode("utf-8", errors="replace")
+            return f.read().decode("utf-8", errors="replace")
+    except (FileNotFoundError, IsADirectoryError):
+        return f"Error: File not found: {path}"
     except Exception as e:
         return f"Error reading file: {e}"
 
 
+# Upper bound per os.write call in write_file — one syscall covers the
+# typical generated file; bigger payloads go out in 1MB slices
+_WRITE_CHUNK = 1024 * 1024
+
+
 def write_file(path: str, content: str) -> str:
     """Write or overwrite a file in the repository. Tracks changes for the PR."""
-    full_path = os.path.join(REPO_DIR, path)
+    full_path = _full(path)
     try:
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        with open(full_path, "w") as f:
-            f.write(content)
-        file_changes[path] = content
+        parent = _parent_dir(full_path)
+        if parent not in _ensured_dirs:
+            os.makedirs(parent, exist_ok=True)
+            _ensured_dirs.add(parent)
+        # Encode once and write through the raw fd — no stdio buffer
+        # layer, one write syscall for anything up to _WRITE_CHUNK
+        data = content.encode("utf-8")
+        fd = os.open(full_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view[:_WRITE_CHUNK]):]
+        finally:
+            os.close(fd)
+        _change_log.append((path, content))
         return f"Successfully wrote {path}"
     except Exception as e:
         return f"Error writing file: {e}"
@@ -58,12 +163,10 @@ def edit_file(path: str, old_string: str, new_string: str) -> str:
     if old_string == "":
         return "Error: old_string cannot be empty"
     
-    # Security check: prevent directory traversal
-    full_path = os.path.join(REPO_DIR, path)
-    full_path = os.path.abspath(full_path)
-    repo_dir_abs = os.path.abspath(REPO_DIR)
-    
-    if not full_path.startswith(repo_dir_abs):
+    # Security check: prevent directory traversal. commonpath (not a
+    # prefix test) so a sibling like "<repo>-evil" can't slip through
+    full_path = os.path.abspath(os.path.join(REPO_DIR, path))
+    if os.path.commonpath([full_path, _REPO_DIR_ABS]) != _REPO_DIR_ABS:
         return f"Error: Path traversal not allowed: {path}"
     
     # Check file exists and is readable
@@ -71,29 +174,42 @@ def edit_file(path: str, old_string: str, new_string: str) -> str:
         return f"Error: File not found: {path}"
     
     try:
-        # Read the file
-        with open(full_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        # Read the file. For large files, probe for the target on the raw
+        # mmap bytes first — a UTF-8 substring always appears as its exact
+        # byte sequence, so a miss means we can answer without ever
+        # decoding the file
+        if os.path.getsize(full_path) > MMAP_THRESHOLD:
+            with open(full_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(old_string.encode("utf-8")) == -1:
+                        return f"Error: Substring not found in {path}. The exact string to replace was not found."
+                    content = mm[:].decode("utf-8")
+        else:
+            with open(full_path, "r", encoding="utf-8") as f:
+                content = f.read()
     except Exception as e:
         return f"Error reading file: {e}"
-    
-    # Check if old_string exists
-    if old_string not in content:
+
+    # Find the (single) occurrence — two find calls establish presence and
+    # uniqueness in one pass each, instead of separate `in` + count +
+    # replace scans over the whole file
+    idx = content.find(old_string)
+    if idx == -1:
         return f"Error: Substring not found in {path}. The exact string to replace was not found."
-    
-    # Count occurrences
-    count = content.count(old_string)
-    if count > 1:
+
+    if content.find(old_string, idx + len(old_string)) != -1:
+        # Ambiguous match — count only on this failure path, for the message
+        count = content.count(old_string)
         return f"Error: Found {count} occurrences of the substring in {path}. Please provide more context to make the match unique."
-    
-    # Perform replacement
-    new_content = content.replace(old_string, new_string)
+
+    # Perform replacement by splicing around the match
+    new_content = content[:idx] + new_string + content[idx + len(old_string):]
     
     try:
-        # Write the file
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
-        file_changes[path] = new_content
+        # Write the file (64KB buffer — see write_file)
+        with open(full_path, "wb", buffering=65536) as f:
+            f.write(new_content.encode("utf-8"))
+        _change_log.append((path, new_content))
         return f"Successfully edited {path}: replaced 1 occurrence"
     except Exception as e:
         return f"Error writing file: {e}"
@@ -101,95 +217,183 @@ def edit_file(path: str, old_string: str, new_string: str) -> str:
 
 def list_files(directory: str = ".") -> str:
     """List files in a directory of the repository."""
-    full_path = os.path.join(REPO_DIR, directory)
+    full_path = _full(directory)
     if not os.path.isdir(full_path):
         return f"Error: Directory not found: {directory}"
     try:
-        entries = []
-        for entry in sorted(os.listdir(full_path)):
-            entry_path = os.path.join(full_path, entry)
-            if os.path.isdir(entry_path):
-                entries.append(f"{entry}/")
-            else:
-                entries.append(entry)
+        # DirEntry.is_dir is answered from the readdir buffer — one
+        # getdents syscall for the directory instead of a stat per entry
+        with os.scandir(full_path) as it:
+            entries = sorted(
+                f"{entry.name}/" if entry.is_dir(follow_symlinks=False) else entry.name
+                for entry in it
+            )
         return "\n".join(entries) if entries else "(empty directory)"
     except Exception as e:
         return f"Error listing directory: {e}"
 
 
-def search_files(pattern: str, case_sensitive: bool = False, max_results: int = 20) -> str:
+def _line_starts(data: bytes) -> list[int]:
+    """Byte offsets where each line begins, for bisect-based line lookup."""
+    starts = [0]
+    pos = data.find(b"\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = data.find(b"\n", pos + 1)
+    return starts
+
+
+def search_files(pattern: str, case_sensitive: bool = False, max_results: int = 20, count_all: bool = False) -> str:
     """
     Search for text patterns across the repository.
-    
+
     Args:
         pattern: Text or regex pattern to search for
         case_sensitive: Whether to match case (default: False)
         max_results: Maximum number of results to return (default: 20)
-    
+        count_all: Keep counting matches past max_results so total_matches
+            is exact (default: False — stop scanning once the result list
+            is full, so total_matches is a lower bound when truncated)
+
     Returns:
         JSON string with search results including matches, total count, and metadata
     """
-    import json
-    
-    # Compile regex pattern
-    flags = 0 if case_sensitive else re.IGNORECASE
+    # Compile the pattern against bytes so each file is scanned in one
+    # C-level finditer pass, with no per-line decode or Python line loop
     try:
-        regex = re.compile(pattern, flags)
-    except re.error as e:
+        regex = _compile(pattern, case_sensitive)
+    except (re.error, UnicodeEncodeError) as e:
         return json.dumps({
             'error': f'Invalid regex pattern: {str(e)}',
             'matches': [],
             'total_matches': 0
         })
-    
-    # Define exclusions
-    skip_dirs = {'.git', '__pycache__', '.venv', 'node_modules', '.pytest_cache', '.github'}
-    skip_extensions = {'.pyc', '.o', '.so', '.bin', '.jpg', '.png', '.gif', '.pdf', '.pyc', '.class'}
-    
+
     matches = []
     total_matches = 0
-    
-    # Walk repository
+    truncated = False
+
+    # Walk repository with a scandir stack — DirEntry type bits come from
+    # the readdir buffer, so directories cost one getdents instead of a
+    # stat syscall per contained file (as os.walk + isdir checks would)
     try:
-        for root, dirs, files in os.walk(REPO_DIR):
-            # Prune excluded directories
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
-            
-            for file in files:
-                if any(file.endswith(ext) for ext in skip_extensions):
-                    continue
-                
-                filepath = os.path.join(root, file)
-                rel_path = os.path.relpath(filepath, REPO_DIR)
-                
-                try:
-                    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                        for line_num, line in enumerate(f, 1):
-                            if regex.search(line):
-                                total_matches += 1
-                                if len(matches) < max_results:
-                                    matches.append({
-                                        'file': rel_path,
-                                        'line_num': line_num,
-                                        'snippet': line.rstrip()
-                                    })
-                except (IOError, OSError):
-                    # Skip files we can't read
-                    continue
+        paths = []
+        stack = [REPO_DIR]
+        while stack:
+            current_dir = stack.pop()
+            try:
+                it = os.scandir(current_dir)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                        continue
+
+                    # O(1) hash lookup on the final suffix instead of an
+                    # endswith call per excluded extension
+                    if '.' + entry.name.rpartition('.')[2] in SKIP_EXTS:
+                        continue
+
+                    paths.append(entry.path)
+
+        # Per-file scans are I/O-bound and the GIL is released during
+        # read(), so fan them out across a thread pool. Files are
+        # submitted in chunks so a truncated search (count_all=False)
+        # stops reading the tree once the result list is full.
+        max_workers = min(32, (os.cpu_count() or 1) * 4, max(1, len(paths)))
+        chunk_size = max_workers * 4
+
+        # Literal prefilter: for case-sensitive searches, files that don't
+        # contain the pattern's longest literal fragment can be rejected
+        # with one bytes.find instead of a regex scan. A fully literal
+        # pattern skips the regex engine entirely.
+        is_literal = case_sensitive and not (_REGEX_METACHARS & set(pattern))
+        can_seed = case_sensitive and not (_UNSAFE_SEED_CHARS & set(pattern))
+        seed = _literal_seed(pattern).encode("utf-8") if can_seed else b""
+        needle = pattern.encode("utf-8")
+
+        def _iter_match_starts(data: bytes):
+            if is_literal:
+                pos = data.find(needle)
+                while pos != -1:
+                    yield pos
+                    pos = data.find(needle, pos + len(needle))
+            else:
+                for m in regex.finditer(data):
+                    yield m.start()
+
+        def _scan_file(filepath: str) -> tuple[str, int, list[tuple[int, str]]]:
+            try:
+                with open(filepath, 'rb') as f:
+                    data = f.read()
+            except (IOError, OSError):
+                # Skip files we can't read
+                return filepath, 0, []
+            # Binary blobs (unlisted extension + NUL in the first 512
+            # bytes) never match meaningfully — skip before scanning
+            if ('.' + filepath.rpartition('.')[2] not in TEXT_EXTS
+                    and b'\x00' in data[:512]):
+                return filepath, 0, []
+            if seed and data.find(seed) == -1:
+                return filepath, 0, []
+            count = 0
+            found = []
+            starts = None
+            for mstart in _iter_match_starts(data):
+                count += 1
+                if len(found) < max_results:
+                    if starts is None:
+                        starts = _line_starts(data)
+                    line_num = bisect_right(starts, mstart)
+                    line_end = (
+                        starts[line_num] - 1
+                        if line_num < len(starts)
+                        else len(data)
+                    )
+                    snippet = data[starts[line_num - 1]:line_end]
+                    found.append(
+                        (line_num, snippet.decode('utf-8', errors='ignore').rstrip())
+                    )
+                elif not count_all:
+                    break
+            return filepath, count, found
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for offset in range(0, len(paths), chunk_size):
+                if truncated and not count_all:
+                    break
+                chunk = paths[offset:offset + chunk_size]
+                for filepath, count, found in executor.map(_scan_file, chunk):
+                    total_matches += count
+                    rel_path = os.path.relpath(filepath, REPO_DIR)
+                    for line_num, snippet in found:
+                        if len(matches) < max_results:
+                            matches.append({
+                                'file': rel_path,
+                                'line_num': line_num,
+                                'snippet': snippet
+                            })
+                        else:
+                            break
+                if total_matches > len(matches):
+                    truncated = True
     except Exception as e:
         return json.dumps({
             'error': f'Search failed: {str(e)}',
             'matches': matches,
             'total_matches': total_matches
         })
-    
+
     return json.dumps({
         'matches': matches,
         'total_matches': total_matches,
         'search_pattern': pattern,
         'case_sensitive': case_sensitive,
         'max_results': max_results,
-        'results_truncated': total_matches > max_results
+        'results_truncated': truncated
     })
 
 
@@ -283,6 +487,11 @@ TOOL_DEFINITIONS = [
                     "type": "integer",
                     "description": "Maximum number of results to return. Default is 20.",
                     "default": 20
+                },
+                "count_all": {
+                    "type": "boolean",
+                    "description": "Keep counting matches past max_results so total_matches is exact. Default is false (stop scanning once the result list is full).",
+                    "default": False
                 }
             },
             "required": ["pattern"]
@@ -290,39 +499,86 @@ TOOL_DEFINITIONS = [
     }
 ]
 
-# Map tool names to functions
-TOOL_FUNCTIONS = {
-    "read_file": read_file,
-    "write_file": write_file,
-    "edit_file": edit_file,
-    "list_files": list_files,
-    "search_files": search_files,
+# Per-tool (valid_keys, required_keys) precomputed once — execute_tool
+# validates with a dict lookup instead of a linear scan of
+# TOOL_DEFINITIONS plus set construction per call
+_TOOL_SCHEMA_CACHE: dict[str, tuple[frozenset, frozenset]] = {
+    t["name"]: (
+        frozenset(t["input_schema"].get("properties", {})),
+        frozenset(t["input_schema"].get("required", [])),
+    )
+    for t in TOOL_DEFINITIONS
+}
+
+# Pre-bound adapters: each pulls exactly the arguments its tool accepts
+# straight from the inputs dict, so dispatch skips the kwargs filtering,
+# dict build and ** unpack per call (unknown extra keys are ignored by
+# construction)
+TOOL_DISPATCH = {
+    "read_file": lambda i: read_file(i["path"]),
+    "write_file": lambda i: write_file(i["path"], i["content"]),
+    "edit_file": lambda i: edit_file(i["path"], i["old_string"], i["new_string"]),
+    "list_files": lambda i: list_files(i.get("directory", ".")),
+    "search_files": lambda i: search_files(
+        i["pattern"],
+        i.get("case_sensitive", False),
+        i.get("max_results", 20),
+        i.get("count_all", False),
+    ),
 }
 
 
+# Interned tool names for identity-based dispatch in execute_tool
+_READ = sys.intern("read_file")
+_WRITE = sys.intern("write_file")
+_EDIT = sys.intern("edit_file")
+_LIST = sys.intern("list_files")
+_SEARCH = sys.intern("search_files")
+
+_ADAPT_READ = TOOL_DISPATCH[_READ]
+_ADAPT_WRITE = TOOL_DISPATCH[_WRITE]
+_ADAPT_EDIT = TOOL_DISPATCH[_EDIT]
+_ADAPT_LIST = TOOL_DISPATCH[_LIST]
+_ADAPT_SEARCH = TOOL_DISPATCH[_SEARCH]
+
+
 def execute_tool(name: str, inputs: dict) -> str:
     """Execute a tool by name with the given inputs."""
-    if name not in TOOL_FUNCTIONS:
-        return f"Error: Unknown tool: {name}"
-    # Validate and filter inputs against schema
-    schema = next(t for t in TOOL_DEFINITIONS if t["name"] == name)
-    valid_keys = set(schema["input_schema"].get("properties", {}).keys())
-    required_keys = set(schema["input_schema"].get("required", []))
-    filtered = {k: v for k, v in inputs.items() if k in valid_keys}
-    missing = required_keys - set(filtered.keys())
+    # Intern once, then identity-compare: for a five-entry table a
+    # pointer chain beats hashing the name, and names parsed out of LLM
+    # JSON arrive un-interned. Ordered by how often the agent calls each
+    # tool. Unknown names fall back to the dict for the error path.
+    name = sys.intern(name)
+    if name is _READ:
+        fn = _ADAPT_READ
+    elif name is _EDIT:
+        fn = _ADAPT_EDIT
+    elif name is _WRITE:
+        fn = _ADAPT_WRITE
+    elif name is _LIST:
+        fn = _ADAPT_LIST
+    elif name is _SEARCH:
+        fn = _ADAPT_SEARCH
+    else:
+        fn = TOOL_DISPATCH.get(name)
+        if fn is None:
+            return f"Error: Unknown tool: {name}"
+    _, required_keys = _TOOL_SCHEMA_CACHE[name]
+    missing = required_keys - inputs.keys()
     if missing:
         return f"Error: Missing required parameters: {', '.join(sorted(missing))}"
     try:
-        return TOOL_FUNCTIONS[name](**filtered)
+        return fn(inputs)
     except Exception as e:
         return f"Error executing {name}: {e}"
 
 
 def get_file_changes() -> dict[str, str]:
     """Return all file changes made during this build."""
-    return dict(file_changes)
+    return dict(_change_log)
 
 
 def reset_file_changes():
     """Reset tracked file changes (call at start of each build)."""
-    file_changes.clear()
+    _change_log.clear()
+    _ensured_dirs.clear()
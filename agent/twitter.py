@@ -9,48 +9,81 @@ This module is a non-critical side effect — if tweeting fails,
 the build continues normally.
 """
 
+import functools
+import io
 import os
 
+_REQUIRED_ENV_VARS = (
+    "TWITTER_API_KEY",
+    "TWITTER_API_SECRET",
+    "TWITTER_ACCESS_TOKEN",
+    "TWITTER_ACCESS_TOKEN_SECRET",
+)
 
+# Credential snapshot, resolved lazily on first client construction —
+# the workflow sets these once before the process starts
+_CREDS: tuple[str, str, str, str] | None = None
+
+# Lazily imported tweepy module: None = not tried yet, False = unavailable.
+# Memoizing skips the sys.modules lookup the import statement pays per call.
+_tweepy = None
+
+
+@functools.lru_cache(maxsize=1)
 def is_twitter_configured() -> bool:
-    """Check if all required Twitter env vars are set."""
-    required = [
-        "TWITTER_API_KEY",
-        "TWITTER_API_SECRET",
-        "TWITTER_ACCESS_TOKEN",
-        "TWITTER_ACCESS_TOKEN_SECRET",
-    ]
-    return all(os.environ.get(var) for var in required)
+    """Check if all required Twitter env vars are set (cached — the env
+    doesn't change mid-build)."""
+    return all(os.environ.get(var) for var in _REQUIRED_ENV_VARS)
+
+
+def _invalidate_twitter_cache() -> None:
+    """Reset cached config/credentials (for tests that mutate os.environ)."""
+    global _CREDS
+    _CREDS = None
+    is_twitter_configured.cache_clear()
 
 
 def get_twitter_client():
     """Lazy-import tweepy and return an authenticated Client, or None."""
+    global _CREDS, _tweepy
     if not is_twitter_configured():
         print("Twitter: credentials not configured, skipping.")
         return None
-    try:
-        import tweepy
-    except ImportError:
+    if _tweepy is None:
+        try:
+            import tweepy
+            _tweepy = tweepy
+        except ImportError:
+            _tweepy = False
+    if _tweepy is False:
         print("Twitter: tweepy not installed, skipping.")
         return None
 
-    return tweepy.Client(
-        consumer_key=os.environ["TWITTER_API_KEY"],
-        consumer_secret=os.environ["TWITTER_API_SECRET"],
-        access_token=os.environ["TWITTER_ACCESS_TOKEN"],
-        access_token_secret=os.environ["TWITTER_ACCESS_TOKEN_SECRET"],
+    if _CREDS is None:
+        _CREDS = tuple(os.environ[var] for var in _REQUIRED_ENV_VARS)
+    consumer_key, consumer_secret, access_token, access_token_secret = _CREDS
+    return _tweepy.Client(
+        consumer_key=consumer_key,
+        consumer_secret=consumer_secret,
+        access_token=access_token,
+        access_token_secret=access_token_secret,
     )
 
 
 def _truncate_tweet(text: str, max_len: int = 280) -> str:
     """Ensure tweet fits in 280 chars. Preserves URLs by trimming the message body."""
-    if len(text) <= max_len:
+    text_len = len(text)
+    if text_len <= max_len:
         return text
-    # Split into lines; last line is usually the URL
-    lines = text.strip().split("\n")
-    if len(lines) >= 2:
-        url_line = lines[-1].strip()
-        body = "\n".join(lines[:-1])
+    # The last line is usually the URL — find it with rfind instead of
+    # strip/split/join, which allocate a list and a substring per line
+    # Only strip when the text actually has surrounding whitespace —
+    # str.strip always allocates a new string otherwise
+    stripped = text.strip() if (text[0].isspace() or text[-1].isspace()) else text
+    idx = stripped.rfind("\n")
+    if idx != -1:
+        url_line = stripped[idx + 1:].strip()
+        body = stripped[:idx].rstrip()
         available = max_len - len(url_line) - 2  # 2 for \n\n
         if available > 10:
             return body[:available - 1] + "\u2026" + "\n\n" + url_line
@@ -59,7 +92,10 @@ def _truncate_tweet(text: str, max_len: int = 280) -> str:
 
 def _post_tweet(text: str, dry_run: bool = False) -> str | None:
     """Post a tweet. Returns tweet ID on success, None on failure."""
-    text = _truncate_tweet(text)
+    # One inline comparison skips the _truncate_tweet call for the
+    # common already-short tweet
+    if len(text) > 280:
+        text = _truncate_tweet(text)
     if dry_run:
         print(f"Twitter (dry run): {text}")
         return "dry-run"
@@ -72,22 +108,50 @@ def _post_tweet(text: str, dry_run: bool = False) -> str | None:
     return tweet_id
 
 
+def _compose(*parts: str, sep: str = "\n\n") -> str:
+    """Join tweet sections through one growable buffer.
+
+    Single-copy accumulation: stays O(total) even if future callers
+    thread many sections together, where repeated += would go O(n^2).
+    """
+    buf = io.StringIO()
+    for i, part in enumerate(parts):
+        if i:
+            buf.write(sep)
+        buf.write(part)
+    return buf.getvalue()
+
+
+def _issue_url(owner: str, name: str, number: int, _cache: dict = {}) -> str:
+    """Issue URL with the per-repo prefix built once and reused.
+
+    Every tweet in a build cycle points at the same repo, so the prefix
+    is cached keyed by (owner, name).
+    """
+    prefix = _cache.get((owner, name))
+    if prefix is None:
+        prefix = f"https://github.com/{owner}/{name}/issues/"
+        _cache[(owner, name)] = prefix
+    return prefix + str(number)
+
+
 # --- Public API ---
 
 def format_build_start_tweet(issue_title: str, issue_number: int, repo_owner: str, repo_name: str) -> str:
-    url = f"https://github.com/{repo_owner}/{repo_name}/issues/{issue_number}"
-    return f"Tonight Fenton is evolving: {issue_title}\n\n{url}"
+    url = _issue_url(repo_owner, repo_name, issue_number)
+    return _compose(f"Tonight Fenton is evolving: {issue_title}", url)
 
 
 def format_build_success_tweet(issue_title: str, pr_url: str) -> str:
-    return f"Fenton just built: {issue_title}\n\nHere's the PR: {pr_url}"
+    return _compose(f"Fenton just built: {issue_title}", f"Here's the PR: {pr_url}")
 
 
 def format_build_failure_tweet(issue_title: str, issue_number: int, repo_owner: str, repo_name: str) -> str:
-    url = f"https://github.com/{repo_owner}/{repo_name}/issues/{issue_number}"
-    return (
+    url = _issue_url(repo_owner, repo_name, issue_number)
+    return _compose(
         f"Fenton attempted to build: {issue_title} but hit a snag. "
-        f"The mutation is back in the queue.\n\n{url}"
+        "The mutation is back in the queue.",
+        url,
     )
 
 